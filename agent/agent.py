@@ -4,16 +4,14 @@ Main agent loop for the Conspiracy Board Agent.
 Orchestrates all modules: search -> extract -> graph -> store in Senso -> narrate.
 Runs for a configurable number of rounds autonomously.
 """
-from dotenv import load_dotenv
-
-load_dotenv()
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from agent.search import search_topic, search_connections
-from agent.extractor import extract_entities_and_connections, get_deeper_search_queries
+from agent.extractor import extract_and_plan
 from agent.graph import ConspiracyGraph
 from agent.senso import store_finding, query_findings
 from agent.narrator import generate_narration
-from agent.vision import analyze_image
+from agent.vision import analyze_images
 
 
 def _emit(on_event, event_type: str, data: dict):
@@ -27,6 +25,7 @@ def run_agent(topic_a: str, topic_b: str, rounds: int = 3, on_event=None) -> Non
     graph.clear()
 
     last_insight: str = ""
+    deeper_queries: list[str] = []  # planned by the previous round's extraction
 
     for round_num in range(1, rounds + 1):
         print(f"\n{'='*50}")
@@ -35,9 +34,46 @@ def run_agent(topic_a: str, topic_b: str, rounds: int = 3, on_event=None) -> Non
 
         _emit(on_event, "round_start", {"round": round_num, "total_rounds": rounds})
 
-        # 1. Query Senso for previous findings
+        # 1+2. Query Senso and search Tavily. The Senso lookup and the
+        # deeper-query planning have no data dependency on the searches, so
+        # all of this I/O runs on the same thread pool: wall clock becomes
+        # max(latency) instead of sum(latency).
         print(f"\n[Senso] Querying previous findings...")
-        previous_context = query_findings(topic_a, topic_b)
+        print(f"\n[Search] Searching Tavily for '{topic_a}' and '{topic_b}'...")
+        round_images: list[str] = []
+        connection_results: list[dict] = []
+        topic_a_results: list[dict] = []
+        topic_b_results: list[dict] = []
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            context_future = executor.submit(query_findings, topic_a, topic_b)
+
+            futures = {
+                executor.submit(search_connections, topic_a, topic_b): "connections",
+                executor.submit(search_topic, topic_a): "topic_a",
+                executor.submit(search_topic, topic_b): "topic_b",
+            }
+
+            # Deeper queries were planned by the previous round's extraction,
+            # so they go out with the core searches at no extra LLM cost.
+            if round_num > 1 and deeper_queries:
+                print(f"  Deeper queries: {deeper_queries}")
+                for query in deeper_queries:
+                    futures[executor.submit(search_topic, query, max_results=3)] = "connections"
+
+            for future in as_completed(futures):
+                results, images = future.result()
+                bucket = futures[future]
+                if bucket == "topic_a":
+                    topic_a_results = results
+                elif bucket == "topic_b":
+                    topic_b_results = results
+                else:
+                    connection_results += results
+                round_images.extend(images)
+
+            previous_context = context_future.result()
+
         if previous_context:
             print(f"  Found prior context ({len(previous_context)} chars)")
         else:
@@ -48,27 +84,6 @@ def run_agent(topic_a: str, topic_b: str, rounds: int = 3, on_event=None) -> Non
             "context_length": len(previous_context) if previous_context else 0,
         })
 
-        # 2. Search
-        print(f"\n[Search] Searching Tavily for '{topic_a}' and '{topic_b}'...")
-        round_images: list[str] = []
-        if round_num == 1:
-            connection_results, conn_images = search_connections(topic_a, topic_b)
-            round_images.extend(conn_images)
-        else:
-            deeper_queries = get_deeper_search_queries(topic_a, topic_b, last_insight)
-            print(f"  Deeper queries: {deeper_queries}")
-            connection_results, conn_images = search_connections(topic_a, topic_b)
-            round_images.extend(conn_images)
-            for query in deeper_queries:
-                extra_results, extra_images = search_topic(query, max_results=3)
-                connection_results += extra_results
-                round_images.extend(extra_images)
-
-        topic_a_results, topic_a_images = search_topic(topic_a)
-        topic_b_results, topic_b_images = search_topic(topic_b)
-        round_images.extend(topic_a_images)
-        round_images.extend(topic_b_images)
-
         all_results = topic_a_results + topic_b_results
         if previous_context:
             all_results.append({
@@ -77,14 +92,28 @@ def run_agent(topic_a: str, topic_b: str, rounds: int = 3, on_event=None) -> Non
                 "content": previous_context,
             })
         all_results += connection_results
+
+        # Dedupe by URL — overlapping queries often return the same Tavily
+        # hits, which would waste prompt budget in extraction. Results with
+        # no URL (e.g. Previous Findings) are always kept.
+        seen_urls: set[str] = set()
+        deduped: list[dict] = []
+        for result in all_results:
+            url = result.get("url", "")
+            if url and url in seen_urls:
+                continue
+            seen_urls.add(url)
+            deduped.append(result)
+        all_results = deduped
         print(f"  Collected {len(all_results)} search results")
         print(f"  Collected {len(round_images)} image URLs")
 
         _emit(on_event, "search_complete", {"result_count": len(all_results), "round": round_num})
 
-        # 3. Extract entities and connections
+        # 3. Extract entities and connections + plan next round's searches
         print(f"\n[Extract] Analyzing with LLM...")
-        extracted = extract_entities_and_connections(topic_a, topic_b, all_results)
+        extracted = extract_and_plan(topic_a, topic_b, all_results, last_insight)
+        deeper_queries = extracted["deeper_queries"]
         print(f"  Entities: {len(extracted['entities_a'])} ({topic_a}) + {len(extracted['entities_b'])} ({topic_b})")
         print(f"  Connections: {len(extracted['connections'])}")
         print(f"  Insight: {extracted['insight']}")
@@ -96,20 +125,25 @@ def run_agent(topic_a: str, topic_b: str, rounds: int = 3, on_event=None) -> Non
             "insight": extracted["insight"],
         })
 
-        # 4. Store in Neo4j
+        # 4. Store in Neo4j — one UNWIND round-trip per type instead of one
+        # session per entity/connection
         print(f"\n[Neo4j] Storing in graph...")
-        for entity in extracted["entities_a"]:
-            graph.add_entity(entity, topic_a, round_num)
-        for entity in extracted["entities_b"]:
-            graph.add_entity(entity, topic_b, round_num)
-        for conn in extracted["connections"]:
-            graph.add_connection(
-                conn["from"],
-                conn["to"],
-                conn["relationship"],
-                conn.get("suspicion_level", 5),
+        with graph.session() as db:
+            graph.add_entities_bulk(
+                [{"name": e, "topic": topic_a, "round": round_num} for e in extracted["entities_a"]]
+                + [{"name": e, "topic": topic_b, "round": round_num} for e in extracted["entities_b"]],
+                session=db,
             )
-        entity_count = graph.get_entity_count()
+            graph.add_connections_bulk([
+                {
+                    "from_name": conn["from"],
+                    "to_name": conn["to"],
+                    "relationship": conn["relationship"],
+                    "suspicion": conn.get("suspicion_level", 5),
+                }
+                for conn in extracted["connections"]
+            ], session=db)
+            entity_count = graph.get_entity_count(session=db)
         print(f"  Total entities in graph: {entity_count}")
 
         _emit(on_event, "graph_update", {
@@ -124,23 +158,27 @@ def run_agent(topic_a: str, topic_b: str, rounds: int = 3, on_event=None) -> Non
         # 5. Store in Senso
         store_finding(topic_a, topic_b, round_num, extracted["insight"], extracted["connections"])
 
-        # 5b. Analyze images with Reka Vision
+        # 5b. Analyze images with Reka Vision — each analysis is an
+        # independent network+LLM hop, so run them in parallel
         unique_images = list(dict.fromkeys(round_images))[:2]  # dedupe, max 2
-        for image_url in unique_images:
-            print(f"[Vision] Analyzing image: {image_url[:80]}...")
-            clue = analyze_image(image_url, topic_a, topic_b)
-            if clue:
-                print(f"  Clue: {clue}")
-                _emit(on_event, "image_clue", {
-                    "image_url": image_url,
-                    "clue_text": clue,
-                    "round": round_num,
-                })
+        if unique_images:
+            for image_url in unique_images:
+                print(f"[Vision] Analyzing image: {image_url[:80]}...")
+            clues = analyze_images(unique_images, topic_a, topic_b)
+            for image_url, clue in zip(unique_images, clues):
+                if clue:
+                    print(f"  Clue: {clue}")
+                    _emit(on_event, "image_clue", {
+                        "image_url": image_url,
+                        "clue_text": clue,
+                        "round": round_num,
+                    })
 
         # 6. Narrate (streams to terminal)
         print(f"\n[Narrator] ", end="", flush=True)
         narration = generate_narration(
-            round_num, topic_a, topic_b, extracted["insight"], entity_count
+            round_num, topic_a, topic_b, extracted["insight"], entity_count,
+            on_event=on_event,
         )
 
         _emit(on_event, "narration", {"text": narration, "round": round_num})
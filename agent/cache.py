@@ -0,0 +1,248 @@
+"""
+Semantic LLM-response cache for the Conspiracy Board Agent.
+
+Caches extractor/narrator responses keyed by a sentence-transformer
+embedding of the prompt; a cosine-similarity hit above the threshold
+returns the cached response without paying LLM latency or cost.
+Degrades gracefully (every lookup is a miss) when sentence-transformers
+or numpy are not installed.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None  # type: ignore
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None  # type: ignore
+
+CACHE_DIR = ".cache"
+
+_EMBED_DIM = 384  # MiniLM output dimension
+_MAX_ELEMENTS = 100_000
+
+_EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+_model = None
+
+
+def _get_model():
+    """Lazily load the embedding model (first load is slow, so defer it)."""
+    global _model
+    if _model is None and SentenceTransformer is not None:
+        _model = SentenceTransformer(_EMBED_MODEL_NAME)
+    return _model
+
+
+_EMBED_PATH = os.path.join(CACHE_DIR, "embeddings.npz")  # legacy single-file store
+_EMBED_DIR = os.path.join(CACHE_DIR, "embeddings")
+_embed_store: dict | None = None
+
+
+def _load_embed_store() -> dict:
+    """Load the on-disk embedding store (hash -> vector) once."""
+    global _embed_store
+    if _embed_store is None:
+        _embed_store = {}
+        if np is not None:
+            # Migrate entries from the old monolithic .npz if present
+            if os.path.exists(_EMBED_PATH):
+                try:
+                    with np.load(_EMBED_PATH) as data:
+                        _embed_store = {key: data[key] for key in data.files}
+                except Exception as e:
+                    print(f"[cache] Warning: could not load embeddings from {_EMBED_PATH}: {e}")
+            if os.path.isdir(_EMBED_DIR):
+                for fname in os.listdir(_EMBED_DIR):
+                    if not fname.endswith(".npy"):
+                        continue
+                    try:
+                        _embed_store[fname[:-4]] = np.load(
+                            os.path.join(_EMBED_DIR, fname)
+                        )
+                    except Exception:
+                        continue  # skip a torn write, re-embed on demand
+    return _embed_store
+
+
+def _persist_embedding(key: str, vector) -> None:
+    """
+    Write one embedding as its own .npy file.
+
+    Per-hash files make each miss an O(1) write instead of rewriting the
+    whole store, and concurrent runs persisting the same prompt write
+    identical bytes instead of clobbering each other's entries.
+    """
+    try:
+        os.makedirs(_EMBED_DIR, exist_ok=True)
+        np.save(os.path.join(_EMBED_DIR, key + ".npy"), vector)
+    except Exception as e:
+        print(f"[cache] Warning: could not persist embedding: {e}")
+
+
+@functools.lru_cache(maxsize=4096)
+def _embed(text: str):
+    """
+    Embed text, memoized per content hash.
+
+    Repeat lookups for the same prompt are a dict hit instead of a model
+    forward pass; embeddings also persist to disk so restarts don't
+    re-embed known prompts.
+    """
+    key = hashlib.sha1(text.encode()).hexdigest()
+    store = _load_embed_store()
+    cached = store.get(key)
+    if cached is not None:
+        return cached
+
+    model = _get_model()
+    embedding = model.encode(
+        text, convert_to_numpy=True, normalize_embeddings=True
+    ).astype(np.float32)
+    store[key] = embedding
+    _persist_embedding(key, embedding)
+    return embedding
+
+
+class SemanticCache:
+    """In-memory embedding cache with cosine-similarity lookup, persisted to disk."""
+
+    def __init__(self, path: str, threshold: float = 0.95) -> None:
+        self.available = np is not None and SentenceTransformer is not None
+        self.path = path
+        self.threshold = threshold
+        self._matrix = None  # (N, dim) normalized embeddings (linear-scan fallback)
+        self._index = None  # hnswlib ANN index, when available
+        self._values: list = []
+        # Concurrent agent runs share one instance; without the lock two
+        # interleaved puts misalign HNSW labels with _values and later
+        # gets silently return the wrong cached response
+        self._lock = threading.Lock()
+
+        if not self.available:
+            print("[cache] Warning: sentence-transformers/numpy not installed — semantic cache disabled")
+            return
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "rb") as f:
+                    stored = pickle.load(f)
+                self._matrix = stored["matrix"]
+                self._values = stored["values"]
+            except Exception as e:
+                print(f"[cache] Warning: could not load cache from {self.path}: {e}")
+
+        # HNSW gives O(log N) similarity lookup instead of an O(N·d) scan
+        # as the cache grows across runs; the matrix stays the persisted
+        # source of truth and the index is rebuilt from it when stale.
+        if hnswlib is not None:
+            try:
+                index = hnswlib.Index(space="cosine", dim=_EMBED_DIM)
+                index_path = self.path + ".hnsw"
+                loaded = False
+                if os.path.exists(index_path) and self._values:
+                    try:
+                        index.load_index(index_path, max_elements=_MAX_ELEMENTS)
+                        loaded = index.element_count == len(self._values)
+                    except Exception:
+                        loaded = False
+                if not loaded:
+                    index = hnswlib.Index(space="cosine", dim=_EMBED_DIM)
+                    index.init_index(
+                        max_elements=_MAX_ELEMENTS, ef_construction=200, M=16
+                    )
+                    if self._matrix is not None:
+                        index.add_items(self._matrix, list(range(len(self._values))))
+                self._index = index
+            except Exception as e:
+                print(f"[cache] Warning: HNSW index unavailable, using linear scan: {e}")
+                self._index = None
+
+    def get(self, text: str):
+        """Return the cached value for the most similar prompt, or None on miss."""
+        if not self.available or len(self._values) == 0:
+            return None
+        try:
+            query = _embed(text)  # outside the lock: the model call is slow
+            with self._lock:
+                if self._index is not None and self._index.element_count > 0:
+                    labels, distances = self._index.knn_query(query, k=1)
+                    similarity = 1.0 - float(distances[0][0])
+                    if similarity >= self.threshold:
+                        return self._values[int(labels[0][0])]
+                    return None
+                if self._matrix is None:
+                    return None
+                similarities = self._matrix @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    return self._values[best]
+        except Exception as e:
+            print(f"[cache] Warning: lookup failed: {e}")
+        return None
+
+    def put(self, text: str, value) -> None:
+        """Store a prompt/value pair and persist the cache to disk."""
+        if not self.available:
+            return
+        try:
+            embedding = _embed(text).reshape(1, -1)
+            with self._lock:
+                if self._matrix is None:
+                    self._matrix = embedding
+                else:
+                    self._matrix = np.vstack([self._matrix, embedding])
+                if self._index is not None:
+                    self._index.add_items(embedding, [len(self._values)])
+                self._values.append(value)
+                self._save()
+        except Exception as e:
+            print(f"[cache] Warning: store failed: {e}")
+
+    def warm(self, texts: list[str]) -> None:
+        """
+        Batch-embed texts into the shared embedding store.
+
+        One model.encode over the whole batch amortizes per-call overhead,
+        so warming N prompts is far cheaper than N cold lookups. Texts
+        already in the store are skipped.
+        """
+        if not self.available or not texts:
+            return
+        try:
+            store = _load_embed_store()
+            missing = [
+                t for t in texts
+                if hashlib.sha1(t.encode()).hexdigest() not in store
+            ]
+            if not missing:
+                return
+            model = _get_model()
+            embeddings = model.encode(
+                missing, batch_size=64, convert_to_numpy=True, normalize_embeddings=True
+            ).astype(np.float32)
+            for text, vector in zip(missing, embeddings):
+                key = hashlib.sha1(text.encode()).hexdigest()
+                store[key] = vector
+                _persist_embedding(key, vector)
+        except Exception as e:
+            print(f"[cache] Warning: warmup failed: {e}")
+
+    def _save(self) -> None:
+        # Caller holds self._lock
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "wb") as f:
+            pickle.dump({"matrix": self._matrix, "values": self._values}, f)
+        if self._index is not None:
+            self._index.save_index(self.path + ".hnsw")
@@ -0,0 +1,24 @@
+"""
+Central configuration for the Conspiracy Board Agent.
+
+Loads .env exactly once at import time and exposes the pre-read values
+every module needs. Previously each module called load_dotenv() itself,
+reparsing the file seven times on startup (and again on every reload
+under uvicorn --reload).
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+NEO4J_URI = os.environ.get("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USERNAME = os.environ.get("NEO4J_USERNAME", "neo4j")
+NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "")
+TAVILY_API_KEY = os.environ.get("TAVILY_API_KEY", "")
+SENSO_API_KEY = os.environ.get("SENSO_API_KEY") or None
+REKA_API_KEY = os.environ.get("REKA_API_KEY", "")
+
+# Proactive OpenAI throttling (0 disables a limiter)
+OPENAI_RPM = float(os.environ.get("OPENAI_RPM", "60"))
+OPENAI_TPM = float(os.environ.get("OPENAI_TPM", "0"))
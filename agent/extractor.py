@@ -2,56 +2,98 @@
 LLM-based entity and connection extractor for the Conspiracy Board Agent.
 
 Uses the OpenAI API (gpt-5.2) to extract entities and suspicious
-connections from raw search result text.
+connections from raw search result text. Extraction and follow-up query
+planning are packed into a single chat completion so each round pays one
+LLM round-trip instead of two.
 """
-import json
-import re
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
 
-load_dotenv()
+try:
+    # orjson's C parser is ~3-5x faster than stdlib json on LLM responses
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
-_client = OpenAI()
+from agent import llm_cache
+from agent import openai_pool
+from agent.cache import SemanticCache, CACHE_DIR
 
+_MODEL = "gpt-5.2"
 
-def extract_entities_and_connections(
-    topic_a: str, topic_b: str, search_results: list[dict]
+# Max chars of search-result text fed to the LLM per extraction, and per
+# individual result (so one long page can't eat the whole budget)
+_TEXT_BUDGET = 3000
+_PER_RESULT_BUDGET = 500
+
+_semantic_cache = SemanticCache(os.path.join(CACHE_DIR, "llm_cache.pkl"))
+
+
+def _fallback_queries(topic_a: str, topic_b: str) -> list[str]:
+    return [
+        f"{topic_a} secret connections",
+        f"{topic_b} hidden links",
+        f"{topic_a} {topic_b} conspiracy",
+    ]
+
+
+def extract_and_plan(
+    topic_a: str,
+    topic_b: str,
+    search_results: list[dict],
+    previous_insight: str = "",
 ) -> dict:
     """
-    Extract entities and connections from search results using an LLM.
+    Extract entities/connections AND plan follow-up searches in one LLM call.
 
     Args:
         topic_a: First topic being researched.
         topic_b: Second topic being researched.
         search_results: list of dicts with keys title, url, content.
+        previous_insight: Insight from the previous round, if any.
 
     Returns:
         dict with keys:
-            entities_a  - list of entity names related to topic_a
-            entities_b  - list of entity names related to topic_b
-            connections - list of {from, to, relationship, suspicion_level} dicts
-            insight     - one-sentence summary of the most suspicious connection
+            entities_a     - list of entity names related to topic_a
+            entities_b     - list of entity names related to topic_b
+            connections    - list of {from, to, relationship, suspicion_level} dicts
+            insight        - one-sentence summary of the most suspicious connection
+            deeper_queries - list of 3 follow-up search queries for the next round
     """
     fallback = {
         "entities_a": [],
         "entities_b": [],
         "connections": [],
         "insight": "No connections found yet...",
+        "deeper_queries": _fallback_queries(topic_a, topic_b),
     }
 
-    # Build text blob, capped at 3000 chars
-    raw_text = "\n".join(r.get("content", "") for r in search_results)
-    if len(raw_text) > 3000:
-        raw_text = raw_text[:3000]
+    # Build text blob, stopping at the char budget instead of joining
+    # everything and throwing most of it away
+    parts: list[str] = []
+    used = 0
+    for result in search_results:
+        content = result.get("content", "")
+        if not content:
+            continue
+        take = min(len(content), _PER_RESULT_BUDGET, _TEXT_BUDGET - used)
+        parts.append(content[:take])
+        used += take + 1  # +1 for the joining newline
+        if used >= _TEXT_BUDGET:
+            break
+    raw_text = "\n".join(parts)
 
     if not raw_text.strip():
         return fallback
 
+    previous_line = (
+        f"Previous insight: {previous_insight}\n\n" if previous_insight else ""
+    )
     user_prompt = (
         f"Topics: '{topic_a}' and '{topic_b}'.\n\n"
+        f"{previous_line}"
         f"Text:\n{raw_text}\n\n"
-        "Extract entities and suspicious connections. "
+        "Extract entities and suspicious connections, then plan 3 specific web "
+        "search queries to dig deeper into the suspicious connections. "
         "Return ONLY valid JSON in this exact structure:\n"
         "{\n"
         '  "entities_a": ["entity1", "entity2"],\n'
@@ -59,85 +101,50 @@ def extract_entities_and_connections(
         '  "connections": [\n'
         '    {"from": "entity_name", "to": "entity_name", "relationship": "one sentence", "suspicion_level": 7}\n'
         "  ],\n"
-        '  "insight": "one sentence summary of the most suspicious connection found"\n'
+        '  "insight": "one sentence summary of the most suspicious connection found",\n'
+        '  "deeper_queries": ["query1", "query2", "query3"]\n'
         "}"
     )
 
+    cached = _semantic_cache.get(user_prompt)
+    if cached is not None:
+        print("[extractor] Semantic cache hit")
+        return cached
+
+    messages = [
+        {"role": "system", "content": "You are a conspiracy theorist AI. Extract entities and find suspicious connections."},
+        {"role": "user", "content": user_prompt},
+    ]
+
     try:
-        response = _client.chat.completions.create(
-            model="gpt-5.2",
-            max_completion_tokens=4096,
-            messages=[
-                {"role": "system", "content": "You are a conspiracy theorist AI. Extract entities and find suspicious connections."},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
-        raw_response = response.choices[0].message.content.strip()
-
-        # Strip markdown code fences if present
-        raw_response = re.sub(r"^```(?:json)?\s*", "", raw_response)
-        raw_response = re.sub(r"\s*```$", "", raw_response)
-
-        parsed = json.loads(raw_response)
+        raw_response = llm_cache.get(messages, _MODEL)
+        if raw_response is None:
+            # json_object mode guarantees syntactically valid JSON, so no
+            # markdown-fence stripping or repair is needed
+            response = openai_pool.chat(
+                model=_MODEL,
+                max_completion_tokens=4096,
+                response_format={"type": "json_object"},
+                messages=messages,
+            )
+            raw_response = response.choices[0].message.content.strip()
+            llm_cache.put(messages, _MODEL, raw_response)
+
+        parsed = _json_loads(raw_response)
 
         # Validate required keys are present, fill missing ones with defaults
-        return {
+        queries = parsed.get("deeper_queries", [])
+        if not isinstance(queries, list) or not queries:
+            queries = fallback["deeper_queries"]
+        extracted = {
             "entities_a": parsed.get("entities_a", []),
             "entities_b": parsed.get("entities_b", []),
             "connections": parsed.get("connections", []),
             "insight": parsed.get("insight", fallback["insight"]),
+            "deeper_queries": [str(q) for q in queries[:3]],
         }
+        _semantic_cache.put(user_prompt, extracted)
+        return extracted
     except Exception as e:
         print(f"[extractor] Warning: extraction failed: {e}")
         return fallback
-
-
-def get_deeper_search_queries(
-    topic_a: str, topic_b: str, previous_insight: str
-) -> list[str]:
-    """
-    Generate follow-up search queries based on a previous insight.
-
-    Args:
-        topic_a: First topic.
-        topic_b: Second topic.
-        previous_insight: One-sentence insight from a previous extraction round.
-
-    Returns:
-        list of 3 specific search query strings.
-    """
-    fallback_queries = [
-        f"{topic_a} secret connections",
-        f"{topic_b} hidden links",
-        f"{topic_a} {topic_b} conspiracy",
-    ]
-
-    try:
-        user_prompt = (
-            f"Topics: '{topic_a}' and '{topic_b}'.\n"
-            f"Previous insight: {previous_insight}\n\n"
-            "Give me exactly 3 specific web search queries to dig deeper into the "
-            "suspicious connections between these topics. "
-            "Return ONLY a JSON array of 3 strings, nothing else."
-        )
-        response = _client.chat.completions.create(
-            model="gpt-5.2",
-            max_completion_tokens=1024,
-            messages=[
-                {"role": "system", "content": "You are a conspiracy theorist AI. Find suspicious connections."},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
-        raw_response = response.choices[0].message.content.strip()
-
-        # Strip markdown code fences if present
-        raw_response = re.sub(r"^```(?:json)?\s*", "", raw_response)
-        raw_response = re.sub(r"\s*```$", "", raw_response)
-
-        queries = json.loads(raw_response)
-        if isinstance(queries, list) and len(queries) >= 1:
-            return [str(q) for q in queries[:3]]
-        return fallback_queries
-    except Exception as e:
-        print(f"[extractor] Warning: query generation failed: {e}")
-        return fallback_queries
@@ -4,10 +4,9 @@ Neo4j graph operations for the Conspiracy Board Agent.
 Stores entities and CONNECTED_TO relationships representing the conspiracy graph.
 Degrades gracefully when Neo4j is unavailable so the agent can run without it.
 """
-import os
-from dotenv import load_dotenv
+from contextlib import contextmanager
 
-load_dotenv()
+from agent import config
 
 try:
     from neo4j import GraphDatabase
@@ -23,14 +22,15 @@ class ConspiracyGraph:
     def __init__(self) -> None:
         self.available = False
         self._driver = None
+        self._entity_count: int | None = None  # maintained by writes
 
         if GraphDatabase is None:
             print("[graph] Warning: neo4j package not installed — graph unavailable")
             return
 
-        uri = os.environ.get("NEO4J_URI", "bolt://localhost:7687")
-        user = os.environ.get("NEO4J_USERNAME", "neo4j")
-        password = os.environ.get("NEO4J_PASSWORD", "")
+        uri = config.NEO4J_URI
+        user = config.NEO4J_USERNAME
+        password = config.NEO4J_PASSWORD
 
         try:
             self._driver = GraphDatabase.driver(uri, auth=(user, password))
@@ -40,9 +40,23 @@ class ConspiracyGraph:
         except ServiceUnavailable as e:
             print(f"[graph] Warning: Neo4j not reachable at {uri}: {e}")
             self._driver = None
+            return
         except Exception as e:
             print(f"[graph] Warning: Could not connect to Neo4j: {e}")
             self._driver = None
+            return
+
+        # Unique constraint gives MERGE an index lookup instead of a scan.
+        # Best effort: older Neo4j syntax or missing schema-write privileges
+        # should cost the index, not the whole graph.
+        try:
+            with self._driver.session() as session:
+                session.run(
+                    "CREATE CONSTRAINT entity_name IF NOT EXISTS "
+                    "FOR (e:Entity) REQUIRE e.name IS UNIQUE"
+                )
+        except Exception as e:
+            print(f"[graph] Warning: could not create entity_name constraint: {e}")
 
     def close(self) -> None:
         """Close the Neo4j driver connection."""
@@ -50,14 +64,39 @@ class ConspiracyGraph:
             self._driver.close()
             self._driver = None
 
-    def clear(self) -> None:
-        """Delete all nodes and relationships (fresh run)."""
+    @contextmanager
+    def session(self):
+        """
+        Yield one reusable Bolt session for a batch of operations.
+
+        Every method takes an optional session= so a whole round's writes
+        and reads share a single session instead of paying connection
+        acquisition per call. Yields None when Neo4j is unavailable.
+        """
         if not self.available or self._driver is None:
+            yield None
             return
         with self._driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
+            yield session
 
-    def add_entity(self, name: str, topic: str, round_num: int = 1) -> None:
+    @contextmanager
+    def _use(self, session):
+        """Yield the caller-provided session, or open a fresh one."""
+        if session is not None:
+            yield session
+            return
+        with self._driver.session() as fresh:
+            yield fresh
+
+    def clear(self, session=None) -> None:
+        """Delete all nodes and relationships (fresh run)."""
+        self._entity_count = 0
+        if not self.available or self._driver is None:
+            return
+        with self._use(session) as s:
+            s.run("MATCH (n) DETACH DELETE n")
+
+    def add_entity(self, name: str, topic: str, round_num: int = 1, session=None) -> None:
         """
         Upsert an Entity node.
 
@@ -65,11 +104,13 @@ class ConspiracyGraph:
             name: Entity name (used as unique key).
             topic: Which input topic this entity belongs to.
             round_num: Agent loop round when entity was discovered.
+            session: Optional session to reuse.
         """
         if not self.available or self._driver is None:
             return
-        with self._driver.session() as session:
-            session.run(
+        self._entity_count = None  # recount on next read
+        with self._use(session) as s:
+            s.run(
                 "MERGE (e:Entity {name: $name}) "
                 "SET e.topic = $topic, e.round = $round",
                 name=name,
@@ -83,6 +124,7 @@ class ConspiracyGraph:
         to_entity: str,
         relationship: str,
         suspicion: int = 5,
+        session=None,
     ) -> None:
         """
         Upsert a CONNECTED_TO relationship between two entity nodes.
@@ -92,11 +134,13 @@ class ConspiracyGraph:
             to_entity: Target entity name.
             relationship: One-sentence description of the connection.
             suspicion: Suspicion level 1-10.
+            session: Optional session to reuse.
         """
         if not self.available or self._driver is None:
             return
-        with self._driver.session() as session:
-            session.run(
+        self._entity_count = None  # recount on next read
+        with self._use(session) as s:
+            s.run(
                 "MERGE (a:Entity {name: $from_name}) "
                 "MERGE (b:Entity {name: $to_name}) "
                 "MERGE (a)-[r:CONNECTED_TO]->(b) "
@@ -107,6 +151,55 @@ class ConspiracyGraph:
                 suspicion=suspicion,
             )
 
+    def add_entities_bulk(self, rows: list[dict], session=None) -> None:
+        """
+        Upsert many Entity nodes in one round-trip.
+
+        The post-write entity total is refreshed with a standalone count
+        query — Neo4j answers that from its count store in O(1), whereas
+        folding it into the write statement would force a label scan —
+        and cached so get_entity_count needs no further round-trip.
+
+        Args:
+            rows: list of {name, topic, round} dicts.
+            session: Optional session to reuse.
+        """
+        if not rows or not self.available or self._driver is None:
+            return
+        with self._use(session) as s:
+            s.run(
+                "UNWIND $rows AS row "
+                "MERGE (e:Entity {name: row.name}) "
+                "SET e.topic = row.topic, e.round = row.round",
+                rows=rows,
+            )
+            record = s.run("MATCH (n:Entity) RETURN count(n) AS total").single()
+            if record is not None:
+                self._entity_count = record["total"]
+
+    def add_connections_bulk(self, rows: list[dict], session=None) -> None:
+        """
+        Upsert many CONNECTED_TO relationships in one round-trip.
+
+        Args:
+            rows: list of {from_name, to_name, relationship, suspicion} dicts.
+            session: Optional session to reuse.
+        """
+        if not rows or not self.available or self._driver is None:
+            return
+        with self._use(session) as s:
+            s.run(
+                "UNWIND $rows AS row "
+                "MERGE (a:Entity {name: row.from_name}) "
+                "MERGE (b:Entity {name: row.to_name}) "
+                "MERGE (a)-[r:CONNECTED_TO]->(b) "
+                "SET r.relationship = row.relationship, r.suspicion = row.suspicion",
+                rows=rows,
+            )
+            record = s.run("MATCH (n:Entity) RETURN count(n) AS total").single()
+            if record is not None:
+                self._entity_count = record["total"]
+
     def get_all_entities(self) -> list[dict]:
         """Return all Entity nodes as a list of dicts."""
         if not self.available or self._driver is None:
@@ -135,11 +228,14 @@ class ConspiracyGraph:
                 for record in result
             ]
 
-    def get_entity_count(self) -> int:
-        """Return the total number of Entity nodes."""
+    def get_entity_count(self, session=None) -> int:
+        """Return the total number of Entity nodes (cached from the last write)."""
+        if self._entity_count is not None:
+            return self._entity_count
         if not self.available or self._driver is None:
             return 0
-        with self._driver.session() as session:
-            result = session.run("MATCH (e:Entity) RETURN count(e) AS cnt")
+        with self._use(session) as s:
+            result = s.run("MATCH (e:Entity) RETURN count(e) AS cnt")
             record = result.single()
-            return record["cnt"] if record else 0
+            self._entity_count = record["cnt"] if record else 0
+            return self._entity_count
@@ -0,0 +1,63 @@
+"""
+Exact-match LLM response cache for the Conspiracy Board Agent.
+
+Zero-false-positive layer in front of the semantic cache: responses are
+keyed by SHA256(model + messages), so re-running an identical request
+(common during development and replays) hits in microseconds instead of
+paying a multi-second API round-trip. Backed by shelve so hits survive
+restarts.
+"""
+import atexit
+import hashlib
+import json
+import os
+import shelve
+import threading
+
+from agent.cache import CACHE_DIR
+
+_DB_PATH = os.path.join(CACHE_DIR, "llm_exact")
+
+# One shelve held open for the process, guarded by a lock: concurrent
+# agent threads re-opening the same dbm file for write can corrupt it,
+# and reopening per call defeats the microsecond-hit point of this layer
+_db = None
+_lock = threading.Lock()
+
+
+def _get_db():
+    """Open the shelve once; caller must hold _lock."""
+    global _db
+    if _db is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _db = shelve.open(_DB_PATH)
+        atexit.register(_db.close)
+    return _db
+
+
+def _key(messages: list[dict], model: str) -> str:
+    payload = model + json.dumps(messages, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get(messages: list[dict], model: str) -> str | None:
+    """Return the cached response text for this exact request, or None."""
+    key = _key(messages, model)
+    try:
+        with _lock:
+            return _get_db().get(key)
+    except Exception as e:
+        print(f"[llm_cache] Warning: lookup failed: {e}")
+        return None
+
+
+def put(messages: list[dict], model: str, response: str) -> None:
+    """Store a response for this exact request."""
+    key = _key(messages, model)
+    try:
+        with _lock:
+            db = _get_db()
+            db[key] = response
+            db.sync()
+    except Exception as e:
+        print(f"[llm_cache] Warning: store failed: {e}")
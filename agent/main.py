@@ -5,12 +5,29 @@ Usage:
   python -m agent.main --web [--port PORT]                 # Web UI mode
 """
 import argparse
+import json
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
+from agent import config  # noqa: F401 — loads .env before anything reads it
 from agent.agent import run_agent
+from agent.cache import CACHE_DIR, SemanticCache
+
+
+def _warm_semantic_cache():
+    """Batch-embed warmup topics, if a warmup file exists, before the run."""
+    warmup_path = os.path.join(CACHE_DIR, "warmup_topics.json")
+    if not os.path.exists(warmup_path):
+        return
+    try:
+        with open(warmup_path) as f:
+            texts = json.load(f)
+        if isinstance(texts, list) and texts:
+            SemanticCache(os.path.join(CACHE_DIR, "llm_cache.pkl")).warm(
+                [str(t) for t in texts]
+            )
+            print(f"[cache] Warmed {len(texts)} embeddings")
+    except Exception as e:
+        print(f"[cache] Warning: warmup skipped: {e}")
 
 
 def main():
@@ -39,15 +56,16 @@ def main():
     args = parser.parse_args()
 
     if args.web:
-        import uvicorn
-        from agent.server import app
+        from agent.server import run_server
         print(f"Starting Conspiracy Board web UI at http://localhost:{args.port}")
-        uvicorn.run(app, host="0.0.0.0", port=args.port)
+        run_server(port=args.port)
         return
 
     if not args.topic_a or not args.topic_b:
         parser.error("topic_a and topic_b are required in CLI mode (or use --web for web UI)")
 
+    _warm_semantic_cache()
+
     print("=== CONSPIRACY BOARD AGENT ===")
     print(f"Investigating: {args.topic_a} <-> {args.topic_b}")
     print(f"Rounds: {args.rounds}")
@@ -4,24 +4,34 @@ Round-aware narration generator for the Conspiracy Board Agent.
 Produces progressively more unhinged narration as rounds advance,
 using OpenAI gpt-5.2 with round-specific system prompts.
 """
-from openai import OpenAI
-from dotenv import load_dotenv
+import io
+import os
 
-load_dotenv()
+from agent import llm_cache
+from agent import openai_pool
+from agent.cache import SemanticCache, CACHE_DIR
 
-_client = OpenAI()
+_MODEL = "gpt-5.2"
 
-_SYSTEM_PROMPTS = {
-    1: "You ARE the conspiracy theorist. You just stumbled onto something BIG. Talk like a paranoid late-night radio host whispering into the mic. Use phrases like 'follow the money', 'they don't want you to see this', 'open your eyes'. Respond in EXACTLY 2-3 sentences. First person. You're narrating YOUR investigation.",
-    2: "You ARE a deep-state-obsessed conspiracy theorist who is SEEING THE PATTERN. You're pacing your apartment, pinning strings to your cork board, muttering to yourself. Use dramatic pauses (ellipses), rhetorical questions, and phrases like 'coincidence? I THINK NOT' and 'the rabbit hole goes deeper'. Respond in EXACTLY 2-3 sentences. First person, increasingly paranoid.",
-    3: "You ARE a FULLY UNHINGED conspiracy theorist who has CRACKED THE CODE. You're recording a frantic voice memo at 3am. Use ALL CAPS for key revelations, reference shadow cabals and hidden agendas, insist NOTHING is a coincidence and EVERYTHING is connected. Be wildly entertaining. Respond in EXACTLY 2-3 sentences. First person, peak unhinged energy.",
-}
+_semantic_cache = SemanticCache(os.path.join(CACHE_DIR, "narration_cache.pkl"))
 
-_FALLBACKS = {
-    1: "Interesting...",
-    2: "THIS IS NOT A COINCIDENCE.",
-    3: "THEY DON'T WANT YOU TO KNOW THIS.",
-}
+# Indexed by min(round, 3) - 1; rounds past 3 stay at peak unhinged
+_SYSTEM_PROMPTS = (
+    "You ARE the conspiracy theorist. You just stumbled onto something BIG. Talk like a paranoid late-night radio host whispering into the mic. Use phrases like 'follow the money', 'they don't want you to see this', 'open your eyes'. Respond in EXACTLY 2-3 sentences. First person. You're narrating YOUR investigation.",
+    "You ARE a deep-state-obsessed conspiracy theorist who is SEEING THE PATTERN. You're pacing your apartment, pinning strings to your cork board, muttering to yourself. Use dramatic pauses (ellipses), rhetorical questions, and phrases like 'coincidence? I THINK NOT' and 'the rabbit hole goes deeper'. Respond in EXACTLY 2-3 sentences. First person, increasingly paranoid.",
+    "You ARE a FULLY UNHINGED conspiracy theorist who has CRACKED THE CODE. You're recording a frantic voice memo at 3am. Use ALL CAPS for key revelations, reference shadow cabals and hidden agendas, insist NOTHING is a coincidence and EVERYTHING is connected. Be wildly entertaining. Respond in EXACTLY 2-3 sentences. First person, peak unhinged energy.",
+)
+
+# System message dicts are constant per round — build them once
+_SYSTEM_MSGS = tuple(
+    {"role": "system", "content": prompt} for prompt in _SYSTEM_PROMPTS
+)
+
+_FALLBACKS = (
+    "Interesting...",
+    "THIS IS NOT A COINCIDENCE.",
+    "THEY DON'T WANT YOU TO KNOW THIS.",
+)
 
 
 def generate_narration(
@@ -30,6 +40,7 @@ def generate_narration(
     topic_b: str,
     insight: str,
     connection_count: int,
+    on_event=None,
 ) -> str:
     """
     Generate round-appropriate narration about a finding.
@@ -40,36 +51,62 @@ def generate_narration(
         topic_b: Second topic being investigated.
         insight: One-sentence insight from extraction.
         connection_count: Total entity count in the graph so far.
+        on_event: Optional callback; receives a narration_delta event per
+            streamed token so the UI can render live.
 
     Returns:
         Narration string. Falls back to a canned string on any error.
     """
-    system_prompt = _SYSTEM_PROMPTS.get(round_num, _SYSTEM_PROMPTS[3])
-    fallback = _FALLBACKS.get(round_num, _FALLBACKS[3])
+    idx = min(max(round_num, 1), 3) - 1
+    fallback = _FALLBACKS[idx]
 
     user_prompt = (
         f"React to this finding about {topic_a} and {topic_b}: "
         f"'{insight}'. {connection_count} connections found so far."
     )
 
+    messages = [
+        _SYSTEM_MSGS[idx],
+        {"role": "user", "content": user_prompt},
+    ]
+
+    def _delta(text: str) -> None:
+        if on_event:
+            on_event({"type": "narration_delta", "round": round_num, "delta": text})
+
+    # Exact-match cache first (zero false positives), then semantic.
+    exact = llm_cache.get(messages, _MODEL)
+    if exact is not None:
+        print(exact)
+        _delta(exact)
+        return exact
+
+    cache_key = f"{round_num}|{insight}"
+    cached = _semantic_cache.get(cache_key)
+    if cached is not None:
+        print(cached)
+        _delta(cached)
+        return cached
+
     try:
-        stream = _client.chat.completions.create(
-            model="gpt-5.2",
+        stream = openai_pool.chat(
+            model=_MODEL,
             max_completion_tokens=1024,
             stream=True,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+            messages=messages,
         )
-        chunks = []
+        buf = io.StringIO()
         for chunk in stream:
             delta = chunk.choices[0].delta if chunk.choices else None
             if delta and delta.content:
                 print(delta.content, end="", flush=True)
-                chunks.append(delta.content)
+                _delta(delta.content)
+                buf.write(delta.content)
         print()  # newline after stream
-        return "".join(chunks).strip()
+        narration = buf.getvalue().strip()
+        llm_cache.put(messages, _MODEL, narration)
+        _semantic_cache.put(cache_key, narration)
+        return narration
     except Exception as e:
         print(f"[narrator] Warning: narration failed: {e}")
         return fallback
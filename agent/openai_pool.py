@@ -0,0 +1,67 @@
+"""
+Proactively rate-limited OpenAI chat calls for the Conspiracy Board Agent.
+
+Parallel extractor/narrator requests can trip OpenAI's RPM/TPM limits and
+then burn wall clock in 429 retry/backoff. Every chat completion goes
+through shared token-bucket limiters that throttle *before* firing, so
+requests queue locally for milliseconds instead of bouncing off the API.
+Limits are configured via OPENAI_RPM / OPENAI_TPM (0 disables a limiter).
+"""
+import threading
+import time
+
+from openai import OpenAI
+
+from agent import config
+
+_client = OpenAI()
+
+
+class _RateLimiter:
+    """Thread-safe token bucket replenished continuously at per_minute/60 per second."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """Block until `amount` tokens are available, then consume them."""
+        if self.capacity <= 0:
+            return
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.capacity / 60.0,
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) * 60.0 / self.capacity
+            time.sleep(wait)
+
+
+_rpm_limiter = _RateLimiter(config.OPENAI_RPM)
+_tpm_limiter = _RateLimiter(config.OPENAI_TPM)
+
+
+def _estimate_tokens(messages: list[dict], max_completion_tokens: int) -> int:
+    """Rough prompt-token estimate (~4 chars/token) plus the completion budget."""
+    prompt_chars = sum(len(m.get("content", "")) for m in messages)
+    return prompt_chars // 4 + max_completion_tokens
+
+
+def chat(**kwargs):
+    """Rate-limited drop-in for client.chat.completions.create(**kwargs)."""
+    _rpm_limiter.acquire()
+    if _tpm_limiter.capacity > 0:
+        _tpm_limiter.acquire(_estimate_tokens(
+            kwargs.get("messages", []),
+            kwargs.get("max_completion_tokens", 0),
+        ))
+    return _client.chat.completions.create(**kwargs)
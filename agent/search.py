@@ -1,25 +1,16 @@
 """
 Tavily search wrapper for the Conspiracy Board Agent.
 """
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from agent import config
 
 try:
     from tavily import TavilyClient
-    _client = TavilyClient(api_key=os.environ.get("TAVILY_API_KEY", ""))
+    _client = TavilyClient(api_key=config.TAVILY_API_KEY)
 except Exception as e:
     print(f"[search] Warning: Could not initialize Tavily client: {e}")
     _client = None
 
 
-def _truncate(text: str, max_len: int = 500) -> str:
-    if not text:
-        return ""
-    return text[:max_len] if len(text) > max_len else text
-
-
 def search_topic(topic: str, max_results: int = 5) -> tuple[list[dict], list[str]]:
     """Search for a topic and return structured results plus image URLs."""
     if _client is None:
@@ -38,7 +29,7 @@ def search_topic(topic: str, max_results: int = 5) -> tuple[list[dict], list[str
             {
                 "title": r.get("title", ""),
                 "url": r.get("url", ""),
-                "content": _truncate(r.get("content", "")),
+                "content": r.get("content", ""),
             }
             for r in results
         ], images[:3]  # cap at 3 image URLs per search
@@ -5,18 +5,25 @@ Uses the Senso Context OS API (apiv2) to search for relevant context.
 Store operations are best-effort — the v2 API primarily exposes search.
 Degrades gracefully when SENSO_API_KEY is not set.
 """
-import os
 import requests
-from dotenv import load_dotenv
 
-load_dotenv()
+from agent import config
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 _BASE_URL = "https://apiv2.senso.ai/api/v1/org"
 
+# Module-level session keeps the TCP+TLS connection alive across calls,
+# so repeat queries pay one RTT instead of a fresh handshake each time.
+_session = requests.Session()
+
 
 def _get_api_key() -> str | None:
-    """Return API key from env, or None."""
-    return os.environ.get("SENSO_API_KEY") or None
+    """Return API key from config, or None."""
+    return config.SENSO_API_KEY
 
 
 def _headers(api_key: str) -> dict:
@@ -55,14 +62,14 @@ def query_findings(topic_a: str, topic_b: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = _session.post(
             f"{_BASE_URL}/search",
             headers=_headers(api_key),
             json=payload,
             timeout=10,
         )
         response.raise_for_status()
-        data = response.json()
+        data = _json_loads(response.content)
         answer = data.get("answer", "")
         if answer and answer != "No results found for your query.":
             return answer[:500]
@@ -4,26 +4,66 @@ Serves the web UI, accepts topic input, runs agent in background thread,
 and streams events to browser via WebSocket.
 """
 import asyncio
+import hashlib
 import json
+import os
+import queue
+import time
 import uuid
 import threading
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, FileResponse
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from dotenv import load_dotenv
-
-load_dotenv()
 
+from agent import config  # noqa: F401 — loads .env before anything reads it
 from agent.agent import run_agent
 
+try:
+    from orjson import dumps as _json_dumps  # returns bytes
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 app = FastAPI(title="Conspiracy Board Agent")
 
-# In-memory store: run_id -> list of events
-_runs: dict[str, list[dict]] = {}
-_run_complete: dict[str, bool] = {}
-_websockets: dict[str, list[WebSocket]] = {}
+# History is bounded and completed runs are reaped, so server memory is
+# O(active_runs x maxlen) instead of growing for the life of the process
+_EVENT_HISTORY_LIMIT = 10_000
+_RUN_TTL_SECONDS = 300
+
+
+@dataclass
+class Run:
+    """All mutable state for one agent run."""
+
+    events: deque = field(
+        default_factory=lambda: deque(maxlen=_EVENT_HISTORY_LIMIT)
+    )  # pre-encoded JSON payloads (bytes) — ~80 B each vs ~500 B as dicts
+    # Named event_queue: a field called `queue` would shadow the module
+    # inside the class body and break the annotation at import time
+    event_queue: queue.SimpleQueue = field(default_factory=queue.SimpleQueue)
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    subscribers: set[WebSocket] = field(default_factory=set)
+    subs_lock: threading.Lock = field(default_factory=threading.Lock)
+    complete: bool = False
+    finished_at: float | None = None
+
+
+_runs: dict[str, Run] = {}
+
+# Bounded pool for agent runs: caps concurrent native threads and reuses
+# them instead of spawning one unbounded daemon thread per /run request
+_executor = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 4) * 2),
+    thread_name_prefix="agent-run",
+)
+_MAX_QUEUED_RUNS = 8
 
 STATIC_DIR = Path(__file__).parent / "static"
 
@@ -34,14 +74,9 @@ class RunRequest(BaseModel):
     rounds: int = 3
 
 
-@app.get("/")
-async def index():
-    """Serve the main HTML page."""
-    index_file = STATIC_DIR / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
-    # Fallback: minimal form if static file doesn't exist yet
-    return HTMLResponse("""
+# Fallback page is constant — build the string and Response once at import
+# instead of reallocating them on every GET /
+_FALLBACK_HTML = """
     <!DOCTYPE html>
     <html><head><title>Conspiracy Board Agent</title></head>
     <body style="font-family:sans-serif;max-width:600px;margin:40px auto;">
@@ -60,33 +95,112 @@ async def index():
           const {run_id} = await res.json();
           const wsProto = location.protocol === 'https:' ? 'wss:' : 'ws:';
           const ws = new WebSocket(`${wsProto}//${location.host}/ws/${run_id}`);
+          ws.binaryType = 'arraybuffer';
           const log = document.getElementById('log');
-          ws.onmessage = (e) => { log.textContent += e.data + '\\n'; log.scrollTop = log.scrollHeight; };
+          const decoder = new TextDecoder();
+          ws.onmessage = (e) => {
+            const text = typeof e.data === 'string' ? e.data : decoder.decode(e.data);
+            // Frames may batch several newline-delimited JSON events
+            for (const line of text.split('\\n')) {
+              if (line) log.textContent += line + '\\n';
+            }
+            log.scrollTop = log.scrollHeight;
+          };
         };
       </script>
     </body></html>
-    """)
+    """
+
+_FALLBACK_RESPONSE = HTMLResponse(_FALLBACK_HTML)
+
+# index.html is read into memory once with a precomputed ETag, so GET /
+# costs no syscalls and revalidating browsers get a bodyless 304
+_INDEX_FILE = STATIC_DIR / "index.html"
+_INDEX_BYTES: bytes | None = None
+_INDEX_ETAG = ""
+if _INDEX_FILE.exists():
+    _INDEX_BYTES = _INDEX_FILE.read_bytes()
+    _INDEX_ETAG = f'"{hashlib.blake2b(_INDEX_BYTES, digest_size=8).hexdigest()}"'
+
+
+@app.get("/")
+async def index(request: Request):
+    """Serve the main HTML page."""
+    if _INDEX_BYTES is not None:
+        # RFC 9110: a 304 carries the headers the 200 would have sent
+        headers = {"ETag": _INDEX_ETAG, "Cache-Control": "public, max-age=60"}
+        if request.headers.get("if-none-match") == _INDEX_ETAG:
+            return Response(status_code=304, headers=headers)
+        return Response(_INDEX_BYTES, media_type="text/html", headers=headers)
+    # Fallback: minimal form if static file doesn't exist yet
+    return _FALLBACK_RESPONSE
+
+
+async def _broadcast_events(run_id: str):
+    """
+    Single consumer per run: woken by an Event, drains the lock-free
+    SimpleQueue in one go, and fans each pre-encoded payload out to every
+    subscriber. Bursts of events cost one wakeup, not one per event.
+    """
+    run = _runs[run_id]
+    while True:
+        await run.wake.wait()
+        run.wake.clear()
+        finished = False
+        while True:
+            try:
+                payload = run.event_queue.get_nowait()
+            except queue.Empty:
+                break
+            if payload is None:  # sentinel: run finished
+                finished = True
+                break
+            # Snapshot under the lock, send outside it so a slow client
+            # never blocks registration, then prune anything dead
+            with run.subs_lock:
+                snapshot = tuple(run.subscribers)
+            dead = []
+            for ws in snapshot:
+                try:
+                    await ws.send_bytes(payload)
+                except Exception:
+                    dead.append(ws)
+            if dead:
+                with run.subs_lock:
+                    run.subscribers.difference_update(dead)
+        if finished:
+            break
 
 
 @app.post("/run")
 async def start_run(req: RunRequest):
     """Start an agent run. Returns run_id for WebSocket connection."""
+    # Backpressure: reject rather than queue unboundedly when saturated
+    if _executor._work_queue.qsize() > _MAX_QUEUED_RUNS:
+        raise HTTPException(status_code=429, detail="Too many queued runs, try again shortly")
+
     run_id = str(uuid.uuid4())[:8]
-    _runs[run_id] = []
-    _run_complete[run_id] = False
-    _websockets[run_id] = []
+    run = Run()
+    _runs[run_id] = run
+    asyncio.create_task(_broadcast_events(run_id))
+
+    # Bind the per-event call chain to locals once: at thousands of
+    # events per run the attribute lookups are the only Python-level
+    # cost left on this path
+    _append = run.events.append
+    _enqueue = run.event_queue.put
+    _wake = run.wake.set
+    _schedule = _call_soon
+    _dumps = _json_dumps
 
     def on_event(event: dict):
-        _runs[run_id].append(event)
-        # Broadcast to all connected websockets for this run
-        for ws in list(_websockets.get(run_id, [])):
-            try:
-                asyncio.run_coroutine_threadsafe(
-                    ws.send_json(event),
-                    _loop
-                )
-            except Exception:
-                pass
+        # Encode once, on the worker thread, off the event loop; every
+        # subscriber and every replay reuses the same bytes. The enqueue
+        # itself needs no loop hop — only the (idempotent) wakeup does.
+        payload = _dumps(event)
+        _append(payload)
+        _enqueue(payload)
+        _schedule(_wake)
 
     def run_in_thread():
         try:
@@ -94,58 +208,131 @@ async def start_run(req: RunRequest):
         except Exception as e:
             on_event({"type": "error", "message": str(e)})
         finally:
-            _run_complete[run_id] = True
+            run.complete = True
+            run.finished_at = time.monotonic()
+            run.event_queue.put(None)
+            _call_soon(run.wake.set)
+            _call_soon(run.done.set)
 
-    thread = threading.Thread(target=run_in_thread, daemon=True)
-    thread.start()
+    _loop.run_in_executor(_executor, run_in_thread)
 
     return {"run_id": run_id}
 
 
+async def _wait_disconnect(websocket: WebSocket):
+    """Block until the client disconnects, swallowing any frames it sends."""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+    except WebSocketDisconnect:
+        return
+
+
 @app.websocket("/ws/{run_id}")
 async def websocket_endpoint(websocket: WebSocket, run_id: str):
     """Stream agent events to the browser in real-time."""
     await websocket.accept()
 
-    if run_id not in _runs:
+    run = _runs.get(run_id)
+    if run is None:
         await websocket.send_json({"type": "error", "message": "Unknown run_id"})
         await websocket.close()
         return
 
-    # Send any events that already happened (client connected late)
-    for event in list(_runs.get(run_id, [])):
-        await websocket.send_json(event)
+    # Send any events that already happened (client connected late) as a
+    # single newline-delimited frame: one await and one websocket frame
+    # instead of one per historical event. deque.copy() snapshots at C
+    # level so the worker thread can keep appending mid-replay.
+    if run.events:
+        await websocket.send_bytes(b"\n".join(run.events.copy()))
 
     # Register for future events
-    _websockets.setdefault(run_id, []).append(websocket)
+    with run.subs_lock:
+        run.subscribers.add(websocket)
 
     try:
-        # Keep connection alive until run completes
-        while not _run_complete.get(run_id, False):
-            try:
-                # Use receive with timeout to check completion periodically
-                await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
-            except asyncio.TimeoutError:
-                continue
-            except WebSocketDisconnect:
-                break
-    except WebSocketDisconnect:
-        pass
+        # Hold the connection until the run completes or the client goes
+        # away: one race of two awaitables, no loop and no task churn
+        if not run.complete:
+            disconnect_task = asyncio.create_task(_wait_disconnect(websocket))
+            done_task = asyncio.create_task(run.done.wait())
+            _finished, pending = await asyncio.wait(
+                {disconnect_task, done_task},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in pending:
+                task.cancel()
     finally:
-        if run_id in _websockets and websocket in _websockets[run_id]:
-            _websockets[run_id].remove(websocket)
+        with run.subs_lock:
+            run.subscribers.discard(websocket)
 
 
-# Capture the event loop reference for cross-thread async calls
+# Captured at startup for cross-thread wakeups; _call_soon is the bound
+# call_soon_threadsafe so the hot path skips two attribute lookups
 _loop: asyncio.AbstractEventLoop = None  # type: ignore
+_call_soon = None
+
+
+async def _reap_completed_runs():
+    """Delete completed runs nobody is watching after a grace period."""
+    while True:
+        await asyncio.sleep(60)
+        now = time.monotonic()
+        for run_id, run in list(_runs.items()):
+            if (
+                run.complete
+                and not run.subscribers
+                and run.finished_at is not None
+                and now - run.finished_at > _RUN_TTL_SECONDS
+            ):
+                del _runs[run_id]
 
 
 @app.on_event("startup")
 async def startup():
-    global _loop
-    _loop = asyncio.get_event_loop()
+    global _loop, _call_soon
+    _loop = asyncio.get_running_loop()
+    _call_soon = _loop.call_soon_threadsafe
+    asyncio.create_task(_reap_completed_runs())
 
 
-# Mount static files if directory exists
+# Mount static files if directory exists (existence verified here, so
+# StaticFiles can skip its own startup stat)
 if STATIC_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    app.mount(
+        "/static",
+        StaticFiles(directory=str(STATIC_DIR), check_dir=False),
+        name="static",
+    )
+
+
+def run_server(host: str = "0.0.0.0", port: int = 8000) -> None:
+    """
+    Run uvicorn tuned for small-frame websocket fan-out: uvloop + httptools
+    when installed (libuv transports roughly halve per-frame CPU), and
+    permessage-deflate off since compressing tiny JSON events costs more
+    than it saves.
+    """
+    import uvicorn
+    try:
+        import uvloop  # noqa: F401
+        loop, http = "uvloop", "httptools"
+    except ImportError:
+        loop, http = "asyncio", "auto"
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        loop=loop,
+        http=http,
+        ws="websockets",
+        ws_per_message_deflate=False,
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
+    )
+
+
+if __name__ == "__main__":
+    run_server(port=int(os.environ.get("PORT", "8000")))
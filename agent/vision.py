@@ -4,24 +4,90 @@ Reka Vision image analyzer for the Conspiracy Board Agent.
 Analyzes images found during research for conspiratorial "clues"
 using the Reka multimodal API.
 """
-import os
-from dotenv import load_dotenv
+import asyncio
+import functools
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from agent import config
+
+log = logging.getLogger("agent.vision")
+
+_MAX_CONCURRENCY = 8
+
+# Manual LRU rather than functools.lru_cache: failures return "" and must
+# not be cached, or one transient error would pin an empty clue for the run.
+# Bounded so the cache can't grow for the life of the server process.
+_CLUE_CACHE_MAX = 1024
+_clue_cache: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+_clue_cache_lock = threading.Lock()
+
+
+def _clue_cache_get(key: tuple[str, str, str]) -> str | None:
+    with _clue_cache_lock:
+        clue = _clue_cache.get(key)
+        if clue is not None:
+            _clue_cache.move_to_end(key)
+        return clue
+
+
+def _clue_cache_put(key: tuple[str, str, str], clue: str) -> None:
+    with _clue_cache_lock:
+        _clue_cache[key] = clue
+        _clue_cache.move_to_end(key)
+        while len(_clue_cache) > _CLUE_CACHE_MAX:
+            _clue_cache.popitem(last=False)
+
+
+def _pooled_httpx_client():
+    """
+    Build a pooled httpx client for the Reka SDK: keep-alive connections
+    skip the per-call TLS handshake, and HTTP/2 (when h2 is installed)
+    multiplexes concurrent analyses over one connection.
+    """
+    import httpx
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+    try:
+        return httpx.Client(http2=True, limits=limits, timeout=30.0)
+    except ImportError:  # h2 not installed
+        return httpx.Client(limits=limits, timeout=30.0)
 
-load_dotenv()
 
 _client = None
+_async_client = None
 try:
     from reka.client import Reka
     from reka import ChatMessage
-    _api_key = os.environ.get("REKA_API_KEY", "")
+    _api_key = config.REKA_API_KEY
     if _api_key:
-        _client = Reka(api_key=_api_key)
+        try:
+            _client = Reka(api_key=_api_key, httpx_client=_pooled_httpx_client())
+        except TypeError:  # SDK version without httpx_client support
+            _client = Reka(api_key=_api_key)
     else:
-        print("[vision] Warning: REKA_API_KEY not set, vision analysis disabled")
+        log.warning("REKA_API_KEY not set, vision analysis disabled")
 except ImportError:
-    print("[vision] Warning: reka package not installed, vision analysis disabled")
+    log.warning("reka package not installed, vision analysis disabled")
 except Exception as e:
-    print(f"[vision] Warning: Could not initialize Reka client: {e}")
+    log.warning("Could not initialize Reka client: %s", e)
+
+
+@functools.lru_cache(maxsize=128)
+def _build_prompt(topic_a: str, topic_b: str) -> str:
+    """Build the analysis prompt for a topic pair (identical across a run)."""
+    return (
+        f"You are a conspiracy theorist investigating connections between '{topic_a}' and '{topic_b}'. "
+        f"Analyze this image for any suspicious details, hidden symbols, or connections to either topic. "
+        f"Respond in EXACTLY 1-2 sentences as a paranoid conspiracy theorist. Be specific about what you see."
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _text_part(topic_a: str, topic_b: str) -> dict:
+    """Memoized text content part — reused for every image in a run."""
+    return {"type": "text", "text": _build_prompt(topic_a, topic_b)}
 
 
 def analyze_image(image_url: str, topic_a: str, topic_b: str) -> str:
@@ -40,11 +106,10 @@ def analyze_image(image_url: str, topic_a: str, topic_b: str) -> str:
     if _client is None:
         return ""
 
-    prompt = (
-        f"You are a conspiracy theorist investigating connections between '{topic_a}' and '{topic_b}'. "
-        f"Analyze this image for any suspicious details, hidden symbols, or connections to either topic. "
-        f"Respond in EXACTLY 1-2 sentences as a paranoid conspiracy theorist. Be specific about what you see."
-    )
+    key = (image_url, topic_a, topic_b)
+    cached = _clue_cache_get(key)
+    if cached is not None:
+        return cached
 
     try:
         response = _client.chat.create(
@@ -52,7 +117,91 @@ def analyze_image(image_url: str, topic_a: str, topic_b: str) -> str:
                 ChatMessage(
                     content=[
                         {"type": "image_url", "image_url": image_url},
-                        {"type": "text", "text": prompt},
+                        _text_part(topic_a, topic_b),
+                    ],
+                    role="user",
+                )
+            ],
+            model="reka-core-20240501",
+        )
+        clue = response.responses[0].message.content.strip()
+        if clue:
+            _clue_cache_put(key, clue)
+        return clue
+    except Exception as e:
+        log.warning("Image analysis failed for %s: %s", image_url, e)
+        return ""
+
+
+def analyze_images(image_urls: list[str], topic_a: str, topic_b: str) -> list[str]:
+    """
+    Analyze several image URLs concurrently.
+
+    Each analysis is an independent Reka round-trip, so they run on a
+    thread pool (capped at 8 workers) — wall time is roughly the slowest
+    request instead of the sum of all of them.
+
+    Returns:
+        Clue strings in the same order as image_urls ("" for failures).
+    """
+    if not image_urls or _client is None:
+        return [""] * len(image_urls)
+    with ThreadPoolExecutor(
+        max_workers=min(_MAX_CONCURRENCY, len(image_urls))
+    ) as executor:
+        return list(
+            executor.map(lambda url: analyze_image(url, topic_a, topic_b), image_urls)
+        )
+
+
+def _get_async_client():
+    """Lazily build the AsyncReka client (shares the pooled-client config)."""
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+    if _client is None:
+        return None
+    try:
+        from reka.client import AsyncReka
+        import httpx
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        try:
+            httpx_client = httpx.AsyncClient(http2=True, limits=limits, timeout=30.0)
+        except ImportError:
+            httpx_client = httpx.AsyncClient(limits=limits, timeout=30.0)
+        try:
+            _async_client = AsyncReka(api_key=_api_key, httpx_client=httpx_client)
+        except TypeError:
+            _async_client = AsyncReka(api_key=_api_key)
+    except Exception as e:
+        log.warning("Could not initialize async Reka client: %s", e)
+    return _async_client
+
+
+async def analyze_image_async(image_url: str, topic_a: str, topic_b: str) -> str:
+    """
+    Coroutine variant of analyze_image for callers on an event loop.
+
+    Uses AsyncReka when available so the loop overlaps the network wait
+    with other work; otherwise hops to a thread via asyncio.to_thread.
+    Shares the clue cache with the sync path.
+    """
+    client = _get_async_client()
+    if client is None:
+        return await asyncio.to_thread(analyze_image, image_url, topic_a, topic_b)
+
+    key = (image_url, topic_a, topic_b)
+    cached = _clue_cache_get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        response = await client.chat.create(
+            messages=[
+                ChatMessage(
+                    content=[
+                        {"type": "image_url", "image_url": image_url},
+                        _text_part(topic_a, topic_b),
                     ],
                     role="user",
                 )
@@ -60,7 +209,9 @@ def analyze_image(image_url: str, topic_a: str, topic_b: str) -> str:
             model="reka-core-20240501",
         )
         clue = response.responses[0].message.content.strip()
+        if clue:
+            _clue_cache_put(key, clue)
         return clue
     except Exception as e:
-        print(f"[vision] Warning: Image analysis failed for {image_url}: {e}")
+        log.warning("Image analysis failed for %s: %s", image_url, e)
         return ""